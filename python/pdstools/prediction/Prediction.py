@@ -1,8 +1,8 @@
 import datetime
-import itertools
 from typing import (
     TYPE_CHECKING,
     Any,
+    Dict,
     List,
     Optional,
     Tuple,
@@ -38,13 +38,111 @@ Figure = Union[Any, "go.Figure"]
 # P = ParamSpec("P")
 
 
+def _format_date(date: datetime.date) -> str:
+    """Format a date the same way as the polars "%v" format does"""
+    return f"{date.day:>2}-{date:%b-%Y}"
+
+
+def _query_cache_key(query: Optional[QUERY]):
+    """Hashable representation of a query, to use as (part of) a cache key"""
+    if query is None:
+        return None
+    if isinstance(query, pl.Expr):
+        return query.meta.serialize()
+    if isinstance(query, dict):
+        return tuple((k, tuple(v)) for k, v in query.items())
+    return tuple(expr.meta.serialize() for expr in query)
+
+
 class PredictionPlots(LazyNamespace):
     dependencies = ["plotly"]
+    # Number of (period, query) combinations to keep the trend data for
+    _trend_data_cache_size = 8
 
     def __init__(self, prediction):
         self.prediction = prediction
+        # Collected trend data per (period, query), shared by the trend plots.
+        # Least recently used first, and only for the prediction data in
+        # _trend_data_source.
+        self._trend_data_cache = {}
+        self._trend_data_source = None
         super().__init__()
 
+    def _split_trend_query(
+        self, period: str, query: Optional[QUERY]
+    ) -> Tuple[Optional[QUERY], Optional[QUERY]]:
+        # Parts of the query on columns that only exist before summarizing (e.g.
+        # SnapshotTime, ModelName) are applied to the prediction data. The rest,
+        # including columns like Positives or CTR that the summary recomputes, is
+        # applied to the summary.
+        pre_summary_columns = set(
+            self.prediction.predictions.collect_schema().names()
+        ) - set(self.prediction.summary_by_channel(by_period=period).collect_schema())
+        return cdh_utils._split_query(query, pre_summary_columns)
+
+    def _prediction_trend_data(
+        self,
+        period: str,
+        query: Optional[QUERY],
+        drop_multichannel: bool = False,
+        drop_unknown_channel: bool = False,
+    ) -> pl.LazyFrame:
+        prediction_query, summary_query = self._split_trend_query(period, query)
+
+        plot_df = self.prediction.summary_by_channel(
+            by_period=period,
+            query=prediction_query,
+            drop_multichannel=drop_multichannel,
+            drop_unknown_channel=drop_unknown_channel,
+        ).with_columns(
+            Prediction=pl.concat_str(
+                [pl.col.Channel, pl.lit(" ("), pl.col.Prediction, pl.lit(")")]
+            ),
+        )
+
+        return cdh_utils._apply_query(plot_df, summary_query)
+
+    def _collected_prediction_trend_data(
+        self, period: str, query: Optional[QUERY]
+    ) -> Tuple[pl.DataFrame, str]:
+        # The cache is only valid for the same underlying prediction data, so
+        # anything cached for replaced data is dropped
+        if self._trend_data_source is not self.prediction.predictions:
+            self._trend_data_cache.clear()
+            self._trend_data_source = self.prediction.predictions
+
+        cache_key = (period, _query_cache_key(query))
+        cached = self._trend_data_cache.pop(cache_key, None)
+        if cached is not None:
+            # Re-inserted to mark it as most recently used
+            self._trend_data_cache[cache_key] = cached
+            return cached
+
+        prediction_query, _ = self._split_trend_query(period, query)
+        date_range_data = cdh_utils._apply_query(
+            self.prediction.predictions, prediction_query
+        ).select(
+            pl.col("SnapshotTime").min().alias("Start"),
+            pl.col("SnapshotTime").max().alias("End"),
+        )
+        plot_data = self._prediction_trend_data(
+            period, query, drop_multichannel=True, drop_unknown_channel=True
+        ).sort("DateRange Min")
+        # Collecting both together lets polars share the common parts of the plans
+        date_range_data, plot_data = pl.collect_all([date_range_data, plot_data])
+
+        start, end = date_range_data.row(0)
+        date_range = (
+            f"period: {_format_date(start)} to {_format_date(end)}"
+            if start is not None and end is not None
+            else None
+        )
+
+        self._trend_data_cache[cache_key] = (plot_data, date_range)
+        if len(self._trend_data_cache) > self._trend_data_cache_size:
+            del self._trend_data_cache[next(iter(self._trend_data_cache))]
+        return plot_data, date_range
+
     def _prediction_trend(
         self,
         period: str,
@@ -56,34 +154,43 @@ class PredictionPlots(LazyNamespace):
         facet_col: str = None,
         bar_mode: bool = False,
     ):
-        plot_df = self.prediction.summary_by_channel(by_period=period).with_columns(
-            Prediction=pl.format("{} ({})", pl.col.Channel, pl.col.Prediction),
-        )
-
-        plot_df = cdh_utils._apply_query(plot_df, query)
-
         if return_df:
-            return plot_df
+            return self._prediction_trend_data(period, query)
 
-        date_range = (
-            cdh_utils._apply_query(self.prediction.predictions, query)
-            .select(
-                pl.format(
-                    "period: {} to {}",
-                    pl.col("SnapshotTime").min().dt.to_string("%v"),
-                    pl.col("SnapshotTime").max().dt.to_string("%v"),
+        plot_data, date_range = self._collected_prediction_trend_data(period, query)
+
+        if facet_row is None and facet_col is None:
+            # Building the traces directly avoids the overhead of plotly express
+            # for the few predictions there typically are
+            traces = []
+            for (prediction,), trace_data in plot_data.partition_by(
+                "Prediction", maintain_order=True, as_dict=True
+            ).items():
+                # Plain arrays avoid plotly's conversion of dataframe columns
+                trace_args = dict(
+                    x=trace_data.get_column("DateRange Min").to_numpy(),
+                    y=trace_data.get_column(metric).to_numpy(),
+                    name=prediction,
+                    hovertemplate=f"Prediction={prediction}<br>DateRange Min=%{{x}}"
+                    f"<br>{metric}=%{{y}}<extra></extra>",
                 )
-            )
-            .collect()
-            .item()
-        )
+                if bar_mode:
+                    traces.append(go.Bar(**trace_args))
+                else:
+                    traces.append(go.Scatter(mode="lines+markers", **trace_args))
 
-        if bar_mode:
+            plt = go.Figure(data=traces).update_layout(
+                title=f"{title}<br>{date_range}",
+                template="pega",
+                xaxis_title="DateRange Min",
+                yaxis_title=metric,
+                barmode="group" if bar_mode else None,
+                # Keeps zoom and legend state when the figure is re-rendered
+                uirevision="trend",
+            )
+        elif bar_mode:
             plt = px.bar(
-                plot_df.filter(pl.col("isMultiChannelPrediction").not_())
-                .filter(pl.col("Channel") != "Unknown")
-                .sort("DateRange Min")
-                .collect(),
+                plot_data,
                 x="DateRange Min",
                 y=metric,
                 barmode="group",
@@ -95,10 +202,7 @@ class PredictionPlots(LazyNamespace):
             )
         else:
             plt = px.line(
-                plot_df.filter(pl.col("isMultiChannelPrediction").not_())
-                .filter(pl.col("Channel") != "Unknown")
-                .sort("DateRange Min")
-                .collect(),
+                plot_data,
                 x="DateRange Min",
                 y=metric,
                 facet_row=facet_row,
@@ -198,6 +302,40 @@ class PredictionPlots(LazyNamespace):
             result.update_layout(yaxis_title="Responses")
         return result
 
+    def trends_all(
+        self,
+        period: str = "1d",
+        *,
+        query: Optional[QUERY] = None,
+    ) -> Dict[str, Figure]:
+        """All prediction trend plots at once
+
+        The data is summarized and collected only once and shared by all plots.
+
+        Parameters
+        ----------
+        period : str, optional
+            Time period to summarize by, as in polars.Expr.dt.truncate. Defaults to "1d".
+        query : QUERY, optional
+            An optional query to apply to the data.
+            For details, see :meth:`pdstools.utils.cdh_utils._apply_query`.
+
+        Returns
+        -------
+        Dict[str, Figure]
+            The performance, lift, CTR and response count trend plots, keyed by
+            "performance", "lift", "ctr" and "responsecount".
+        """
+        # Collects the data for all plots, the trend plots below reuse it
+        self._collected_prediction_trend_data(period, query)
+
+        return {
+            "performance": self.performance_trend(period, query=query),
+            "lift": self.lift_trend(period, query=query),
+            "ctr": self.ctr_trend(period, query=query),
+            "responsecount": self.responsecount_trend(period, query=query),
+        }
+
 
 class Prediction:
     """Monitor Pega Prediction Studio Predictions"""
@@ -208,12 +346,19 @@ class Prediction:
     # These are pretty strict conditions - many configurations appear not to satisfy these
     # perhaps the Total = Test + Control is no longer met when Impact Analyzer is around
     prediction_validity_expr = (
-        (pl.col("Positives") > 0)
-        & (pl.col("Positives_Test") > 0)
-        & (pl.col("Positives_Control") > 0)
-        & (pl.col("Negatives") > 0)
-        & (pl.col("Negatives_Test") > 0)
-        & (pl.col("Negatives_Control") > 0)
+        # All counts positive. Like a chain of &, a missing count makes the
+        # result null rather than valid.
+        pl.all_horizontal(
+            pl.col(
+                "Positives",
+                "Positives_Test",
+                "Positives_Control",
+                "Negatives",
+                "Negatives_Test",
+                "Negatives_Control",
+            )
+            > 0
+        )
         # & (
         #     pl.col("Positives")
         #     == (pl.col("Positives_Test") + pl.col("Positives_Control"))
@@ -244,45 +389,91 @@ class Prediction:
         self.plot = PredictionPlots(prediction=self)
 
         predictions_raw_data_prepped = (
-            (
-                df.filter(pl.col.pyModelType == "PREDICTION")
-                .with_columns(
-                    # Unlike ADM we only support one pattern currently
-                    SnapshotTime=pl.col("pySnapShotTime")
-                    .str.slice(0, 8)
-                    .str.strptime(pl.Date, "%Y%m%d"),
-                    Performance=pl.col("pyValue").cast(pl.Float32),
-                )
-                .rename(
-                    {
-                        "pyPositives": "Positives",
-                        "pyNegatives": "Negatives",
-                        "pyCount": "ResponseCount",
-                    }
-                )
+            df.filter(pl.col.pyModelType == "PREDICTION")
+            .with_columns(
+                # Unlike ADM we only support one pattern currently. Only the
+                # fixed width date part is parsed, strictly.
+                SnapshotTime=pl.col("pySnapShotTime")
+                .str.head(8)
+                .str.to_date("%Y%m%d", strict=True),
+                Performance=pl.col("pyValue").cast(pl.Float32),
+            )
+            .rename(
+                {
+                    "pyPositives": "Positives",
+                    "pyNegatives": "Negatives",
+                    "pyCount": "ResponseCount",
+                }
+            )
+            # Only keep what is used below so the projection can be pushed
+            # down into the scan of the raw data
+            .select(
+                [
+                    "pyModelId",
+                    "SnapshotTime",
+                    "Positives",
+                    "Negatives",
+                    "ResponseCount",
+                    "Performance",
+                    "pyDataUsage",
+                    "pySnapshotType",
+                ]
             )
-            # collect/lazy hopefully helps to zoom in into issues
-            .collect().lazy()
         )
+        if logger.isEnabledFor(logging.DEBUG):
+            # Materializing here helps to zoom in into issues with the raw data
+            predictions_raw_data_prepped = predictions_raw_data_prepped.collect().lazy()
 
-        # Below looks like a pivot.. but we want to make sure Control, Test and NBA
-        # columns are always there...
-        # TODO we may want to assert that this results in exactly one record for
-        # every combination of model ID and snapshot time.
-        counts_control = predictions_raw_data_prepped.filter(
-            pl.col.pyDataUsage == "Control"
-        ).select(
-            ["pyModelId", "SnapshotTime", "Positives", "Negatives", "ResponseCount"]
+        # Below is a pivot done as a single group by with conditional aggregations,
+        # so the Control, Test and NBA columns are always there, even when there
+        # is no data for e.g. NBA. Duplicate records for the same model ID and
+        # snapshot time are summed. A missing count on any of them leaves the
+        # total missing too, rather than silently counting it as zero.
+        data_usages = ["Test", "Control", "NBA"]
+        counts_by_data_usage = (
+            predictions_raw_data_prepped.group_by(["pyModelId", "SnapshotTime"])
+            .agg(
+                [
+                    (pl.col.pyDataUsage == data_usage).any().alias(f"_has_{data_usage}")
+                    for data_usage in data_usages
+                ]
+                + [
+                    pl.when(
+                        (pl.col.pyDataUsage == data_usage).any()
+                        & pl.col(metric)
+                        .filter(pl.col.pyDataUsage == data_usage)
+                        .is_not_null()
+                        .all()
+                    )
+                    .then(pl.col(metric).filter(pl.col.pyDataUsage == data_usage).sum())
+                    .alias(f"{metric}_{data_usage}")
+                    for data_usage in data_usages
+                    for metric in ["Positives", "Negatives", "ResponseCount"]
+                ]
+            )
+            # Test and Control records are required, NBA is optional. This is
+            # about the records being there, not about their counts being filled.
+            .filter(pl.col("_has_Test") & pl.col("_has_Control"))
+            .drop([f"_has_{data_usage}" for data_usage in data_usages])
         )
-        counts_test = predictions_raw_data_prepped.filter(
-            pl.col.pyDataUsage == "Test"
-        ).select(
-            ["pyModelId", "SnapshotTime", "Positives", "Negatives", "ResponseCount"]
+
+        # Model IDs are the class and the model name, separated by the last "!"
+        # that has at least one character on either side. The "!" is looked up
+        # with the outer characters stripped, so e.g. "a!b!" splits into "a" and
+        # "b!". Without such a separator both are null.
+        model_id_inner_parts = (
+            pl.col("pyModelId").str.slice(1).str.head(-1).str.split("!")
         )
-        counts_NBA = predictions_raw_data_prepped.filter(
-            pl.col.pyDataUsage == "NBA"
-        ).select(
-            ["pyModelId", "SnapshotTime", "Positives", "Negatives", "ResponseCount"]
+        model_name_length = (
+            model_id_inner_parts.list.last().str.len_chars().cast(pl.Int64) + 1
+        )
+        is_split_model_id = model_id_inner_parts.list.len() > 1
+        # Bound once so the lift can reuse them in the same with_columns
+        ctr_test = pl.col("Positives_Test") / (
+            pl.col("Positives_Test") + pl.col("Negatives_Test")
+        )
+        ctr_control = pl.col("Positives_Control") / (
+            pl.col("Positives_Control") + pl.col("Negatives_Control")
         )
 
         self.predictions = (
@@ -300,25 +491,27 @@ class Prediction:
                     "Performance",
                 ]
             )
-            .join(counts_test, on=["pyModelId", "SnapshotTime"], suffix="_Test")
-            .join(counts_control, on=["pyModelId", "SnapshotTime"], suffix="_Control")
-            .join(
-                counts_NBA, on=["pyModelId", "SnapshotTime"], suffix="_NBA", how="left"
-            )
+            .join(counts_by_data_usage, on=["pyModelId", "SnapshotTime"])
             .with_columns(
-                Class=pl.col("pyModelId").str.extract(r"(.+)!.+"),
-                ModelName=pl.col("pyModelId").str.extract(r".+!(.+)"),
-                CTR=pl.col("Positives") / (pl.col("Positives") + pl.col("Negatives")),
-                CTR_Test=pl.col("Positives_Test")
-                / (pl.col("Positives_Test") + pl.col("Negatives_Test")),
-                CTR_Control=pl.col("Positives_Control")
-                / (pl.col("Positives_Control") + pl.col("Negatives_Control")),
-                CTR_NBA=pl.col("Positives_NBA")
-                / (pl.col("Positives_NBA") + pl.col("Negatives_NBA")),
-            )
-            .with_columns(
-                CTR_Lift=(pl.col("CTR_Test") - pl.col("CTR_Control"))
-                / pl.col("CTR_Control"),
+                Class=pl.when(is_split_model_id).then(
+                    pl.col("pyModelId").str.head(-(model_name_length + 1))
+                ),
+                # Upper case as in the NBAD prediction to channel mapping
+                ModelName=pl.when(is_split_model_id).then(
+                    pl.col("pyModelId").str.tail(model_name_length).str.to_uppercase()
+                ),
+                # Counts stay in their source type so their sums remain exact,
+                # only the ratios derived from them are narrowed to Float32
+                CTR=(
+                    pl.col("Positives") / (pl.col("Positives") + pl.col("Negatives"))
+                ).cast(pl.Float32),
+                CTR_Test=ctr_test.cast(pl.Float32),
+                CTR_Control=ctr_control.cast(pl.Float32),
+                CTR_NBA=(
+                    pl.col("Positives_NBA")
+                    / (pl.col("Positives_NBA") + pl.col("Negatives_NBA"))
+                ).cast(pl.Float32),
+                CTR_Lift=((ctr_test - ctr_control) / ctr_control).cast(pl.Float32),
                 isValidPrediction=self.prediction_validity_expr,
             )
             .sort(["pyModelId", "SnapshotTime"])
@@ -326,95 +519,82 @@ class Prediction:
 
         self.predictions = cdh_utils._apply_query(self.predictions, query)
 
+        # Availability and validity of the predictions data they were determined for
+        self._availability_cache = (None, False, False)
+        # Resolved summary dates per date arguments, with the predictions data
+        # they were resolved for
+        self._date_range_cache = {}
+
     @staticmethod
     def from_mock_data(days=70):
         n_conditions = 4  # can't change this
         n_predictions = 3  # tied to the data below
         now = datetime.datetime.now()
 
-        def _interpolate(min, max, i, n):
-            return min + (max - min) * i / (n - 1)
+        def _interpolate(min, max):
+            # Linear interpolation from the first to the last day
+            return pl.col(min) + (pl.col(max) - pl.col(min)) * pl.col("Day") / (
+                days - 1
+            )
+
+        mock_predictions = pl.LazyFrame(
+            {
+                "pyModelId": (
+                    ["DATA-DECISION-REQUEST-CUSTOMER!PredictOutboundEmailPropensity"]
+                    * n_conditions
+                    + ["DATA-DECISION-REQUEST-CUSTOMER!PREDICTMOBILEPROPENSITY"]
+                    * n_conditions
+                    + ["DATA-DECISION-REQUEST-CUSTOMER!PREDICTWEBPROPENSITY"]
+                    * n_conditions
+                ),
+                "pySnapshotType": ["Daily", "Daily", "Daily", None] * n_predictions,
+                "pyDataUsage": ["Control", "Test", "NBA", ""]
+                * n_predictions,  # Control=Random, Test=Model
+                "PositivesFirstDay": [100, 160, 120, None]
+                + [120, 250, 150, None]
+                + [1400, 2800, 1520, None],
+                "PositivesLastDay": [100, 200, 120, None]
+                + [120, 300, 150, None]
+                + [1400, 4000, 1520, None],
+                "pyNegatives": [10000] * n_conditions
+                + [6000] * n_conditions
+                + [40000] * n_conditions,
+                "ValueFirstDay": [60.0] * n_conditions
+                + [70.0] * n_conditions
+                + [66.0] * n_conditions,
+                "ValueLastDay": [65.0] * n_conditions
+                + [73.0] * n_conditions
+                + [68.0] * n_conditions,
+            }
+        )
 
         mock_prediction_data = (
             pl.LazyFrame(
                 {
-                    "pySnapShotTime": sorted(
-                        [
-                            cdh_utils.to_prpc_date_time(
-                                now - datetime.timedelta(days=i)
-                            )[
-                                0:15
-                            ]  # Polars doesn't like time zones like GMT+0200
-                            for i in range(days)
-                        ]
-                        * n_conditions
-                        * n_predictions
-                    ),
-                    "pyModelId": (
-                        [
-                            "DATA-DECISION-REQUEST-CUSTOMER!PredictOutboundEmailPropensity"
-                        ]
-                        * n_conditions
-                        + ["DATA-DECISION-REQUEST-CUSTOMER!PREDICTMOBILEPROPENSITY"]
-                        * n_conditions
-                        + ["DATA-DECISION-REQUEST-CUSTOMER!PREDICTWEBPROPENSITY"]
-                        * n_conditions
-                    )
-                    * days,
-                    "pyModelType": "PREDICTION",
-                    "pySnapshotType": ["Daily", "Daily", "Daily", None]
-                    * n_predictions
-                    * days,
-                    "pyDataUsage": ["Control", "Test", "NBA", ""]
-                    * n_predictions
-                    * days,  # Control=Random, Test=Model
-                    # "pyPositives": (
-                    #     [100, 160, 120, None] + [200, 420, 250, None] + [350, 700, 380, None]
-                    # )
-                    # * n_days,
-                    "pyPositives": list(
-                        itertools.chain.from_iterable(
-                            [
-                                [
-                                    _interpolate(100, 100, p, days),
-                                    _interpolate(160, 200, p, days),
-                                    _interpolate(120, 120, p, days),
-                                    None,
-                                ]
-                                + [
-                                    _interpolate(120, 120, p, days),
-                                    _interpolate(250, 300, p, days),
-                                    _interpolate(150, 150, p, days),
-                                    None,
-                                ]
-                                + [
-                                    _interpolate(1400, 1400, p, days),
-                                    _interpolate(2800, 4000, p, days),
-                                    _interpolate(1520, 1520, p, days),
-                                    None,
-                                ]
-                                for p in range(0, days)
-                            ]
-                        )
-                    ),
-                    "pyNegatives": (
-                        [10000] * n_conditions
-                        + [6000] * n_conditions
-                        + [40000] * n_conditions
+                    "pySnapShotTime": pl.datetime_range(
+                        now - datetime.timedelta(days=days - 1),
+                        now,
+                        interval="1d",
+                        eager=True,
                     )
-                    * days,
-                    "pyValue": list(
-                        itertools.chain.from_iterable(
-                            [
-                                [_interpolate(60.0, 65.0, p, days)] * n_conditions
-                                + [_interpolate(70.0, 73.0, p, days)] * n_conditions
-                                + [_interpolate(66.0, 68.0, p, days)] * n_conditions
-                                for p in range(0, days)
-                            ]
-                        )
-                    ),
                 }
-            ).sort(["pySnapShotTime", "pyModelId", "pySnapshotType"])
+            )
+            .with_row_index("Day")
+            .join(mock_predictions, how="cross")
+            .select(
+                # Polars doesn't like time zones like GMT+0200
+                pl.col("pySnapShotTime").dt.strftime("%Y%m%dT%H%M%S"),
+                "pyModelId",
+                pl.lit("PREDICTION").alias("pyModelType"),
+                "pySnapshotType",
+                "pyDataUsage",
+                _interpolate("PositivesFirstDay", "PositivesLastDay").alias(
+                    "pyPositives"
+                ),
+                "pyNegatives",
+                _interpolate("ValueFirstDay", "ValueLastDay").alias("pyValue"),
+            )
+            .sort(["pySnapShotTime", "pyModelId", "pySnapshotType"])
             # .with_columns(
             #     pl.col("pyPositives").cum_sum().over(["pyModelId", "pySnapshotType"]),
             #     pl.col("pyNegatives").cum_sum().over(["pyModelId", "pySnapshotType"]),
@@ -426,17 +606,46 @@ class Prediction:
 
     @property
     def is_available(self) -> bool:
-        return len(self.predictions.head(1).collect()) > 0
+        if self._availability_cache[0] is self.predictions:
+            return self._availability_cache[1]
+        return self.predictions.limit(1).select(pl.len()).collect().item() > 0
 
     @property
     def is_valid(self) -> bool:
-        return (
-            self.is_available
-            # or even stronger: pos = pos_test + pos_control
-            and self.predictions.select(self.prediction_validity_expr.all())
-            .collect()
-            .item()
+        if self._availability_cache[0] is not self.predictions:
+            availability, validity = pl.collect_all(
+                [
+                    self.predictions.limit(1).select(pl.len()),
+                    # or even stronger: pos = pos_test + pos_control
+                    self.predictions.select(self.prediction_validity_expr.all()),
+                ]
+            )
+            is_available = availability.item() > 0
+            self._availability_cache = (
+                self.predictions,
+                is_available,
+                is_available and validity.item(),
+            )
+        return self._availability_cache[2]
+
+    def _start_end_date(
+        self,
+        start_date: Optional[datetime.datetime],
+        end_date: Optional[datetime.datetime],
+        window: Optional[Union[int, datetime.timedelta]],
+    ) -> Tuple[datetime.datetime, datetime.datetime]:
+        # Resolving the dates may need to collect the data, so this is only
+        # done once per set of date arguments
+        cache_key = (start_date, end_date, window)
+        cached = self._date_range_cache.get(cache_key)
+        if cached is not None and cached[0] is self.predictions:
+            return cached[1]
+
+        start_end_date = cdh_utils.get_start_end_date_args(
+            self.predictions, start_date, end_date, window
         )
+        self._date_range_cache[cache_key] = (self.predictions, start_end_date)
+        return start_end_date
 
     def summary_by_channel(
         self,
@@ -446,6 +655,9 @@ class Prediction:
         end_date: Optional[datetime.datetime] = None,
         window: Optional[Union[int, datetime.timedelta]] = None,
         by_period: Optional[str] = None,
+        query: Optional[QUERY] = None,
+        drop_multichannel: bool = False,
+        drop_unknown_channel: bool = False,
         debug: bool = False,
     ) -> pl.LazyFrame:
         """Summarize prediction per channel
@@ -462,6 +674,13 @@ class Prediction:
             Number of days to use for the summary period or an explicit timedelta. If None (default) uses the whole period. Can't be given if start and end date are also given.
         by_period : str, optional
             Optional additional grouping by time period. Format string as in polars.Expr.dt.truncate (https://docs.pola.rs/api/python/stable/reference/expressions/api/polars.Expr.dt.truncate.html), for example "1mo", "1w", "1d" for calendar month, week day. Defaults to None.
+        query : QUERY, optional
+            An optional query to apply to the prediction data before summarizing.
+            For details, see :meth:`pdstools.utils.cdh_utils._apply_query`.
+        drop_multichannel : bool, optional
+            If True, leaves out the multi-channel predictions. Defaults to False.
+        drop_unknown_channel : bool, optional
+            If True, leaves out the predictions that could not be mapped to a channel. Defaults to False.
         debug : bool, optional
             If True, enables debug mode for additional logging or outputs. Defaults to False.
 
@@ -507,29 +726,72 @@ class Prediction:
         if not custom_predictions:
             custom_predictions = []
 
-        start_date, end_date = cdh_utils.get_start_end_date_args(
-            self.predictions, start_date, end_date, window
+        start_date, end_date = self._start_end_date(start_date, end_date, window)
+
+        time_query = pl.col("SnapshotTime").is_between(start_date, end_date)
+        prediction_data = cdh_utils._apply_query(
+            self.predictions,
+            query=(
+                time_query
+                if query is None
+                else cdh_utils._combine_queries(query, time_query)
+            ),
+            allow_empty=True,
         )
 
-        query = pl.col("SnapshotTime").is_between(start_date, end_date)
-        prediction_data = cdh_utils._apply_query(self.predictions, query=query, allow_empty=True)
+        # Bound once so the date range and duration share them
+        first_snapshot = pl.col("SnapshotTime").min()
+        last_snapshot = pl.col("SnapshotTime").max()
+        # Positives plus negatives, used in several of the metrics. Bound once so
+        # all metrics can be added in a single with_columns that shares them.
+        counts_test = pl.col("Positives_Test") + pl.col("Negatives_Test")
+        counts_control = pl.col("Positives_Control") + pl.col("Negatives_Control")
+        counts_total = pl.sum_horizontal(
+            "Positives_Test",
+            "Negatives_Test",
+            "Positives_Control",
+            "Negatives_Control",
+            "Positives_NBA",
+            "Negatives_NBA",
+        )
+        ctr_test = pl.col("Positives_Test") / counts_test
+        ctr_control = pl.col("Positives_Control") / counts_control
 
+        group_keys = [
+            "Prediction",
+            "Channel",
+            "Direction",
+            "isStandardNBADPrediction",
+            "isMultiChannelPrediction",
+        ]
+        dropped_columns = []
+        # All the period handling in one place, nothing extra without a period
+        period_expr = []
         if by_period is not None:
-            period_expr = [
+            period_expr.append(
                 pl.col("SnapshotTime")
                 .dt.truncate(by_period)
                 .cast(pl.Date)
                 .alias("Period")
-            ]
-        else:
-            period_expr = []
+            )
+            group_keys.append("Period")
+            if not debug:
+                dropped_columns.append("Period")
 
-        return (
-            prediction_data.with_columns(pl.col("ModelName").str.to_uppercase())
-            .join(
-                self.cdh_guidelines.get_predictions_channel_mapping(
-                    custom_predictions
-                ).lazy(),
+        prediction_data = (
+            prediction_data.join(
+                # Only the mapping itself, so the join does not carry anything else
+                self.cdh_guidelines.get_predictions_channel_mapping(custom_predictions)
+                .select(
+                    [
+                        "Prediction",
+                        "Channel",
+                        "Direction",
+                        "isStandardNBADPrediction",
+                        "isMultiChannelPrediction",
+                    ]
+                )
+                .lazy(),
                 left_on="ModelName",
                 right_on="Prediction",
                 how="left",
@@ -537,41 +799,30 @@ class Prediction:
             .rename({"ModelName": "Prediction"})
             .with_columns(
                 [
-                    pl.when(pl.col("Channel").is_null())
-                    .then(pl.lit("Unknown"))
-                    .otherwise(pl.col("Channel"))
-                    .alias("Channel"),
-                    pl.when(pl.col("Direction").is_null())
-                    .then(pl.lit("Unknown"))
-                    .otherwise(pl.col("Direction"))
-                    .alias("Direction"),
-                    pl.when(pl.col("isStandardNBADPrediction").is_null())
-                    .then(pl.lit(False))
-                    .otherwise(pl.col("isStandardNBADPrediction"))
-                    .alias("isStandardNBADPrediction"),
-                    pl.when(pl.col("isMultiChannelPrediction").is_null())
-                    .then(pl.lit(False))
-                    .otherwise(pl.col("isMultiChannelPrediction"))
-                    .alias("isMultiChannelPrediction"),
+                    pl.col("Channel").fill_null("Unknown"),
+                    pl.col("Direction").fill_null("Unknown"),
+                    pl.col("isStandardNBADPrediction").fill_null(False),
+                    pl.col("isMultiChannelPrediction").fill_null(False),
                 ]
                 + period_expr
             )
-            .group_by(
-                [
-                    "Prediction",
-                    "Channel",
-                    "Direction",
-                    "isStandardNBADPrediction",
-                    "isMultiChannelPrediction",
-                ]
-                + (["Period"] if by_period is not None else [])
-            )
+        )
+
+        # These are on group keys, so filter before aggregating
+        group_filter = []
+        if drop_multichannel:
+            group_filter.append(pl.col("isMultiChannelPrediction").not_())
+        if drop_unknown_channel:
+            group_filter.append(pl.col("Channel") != "Unknown")
+        if group_filter:
+            prediction_data = prediction_data.filter(group_filter)
+
+        return (
+            prediction_data.group_by(group_keys)
             .agg(
-                pl.col("SnapshotTime").min().cast(pl.Date).alias("DateRange Min"),
-                pl.col("SnapshotTime").max().cast(pl.Date).alias("DateRange Max"),
-                (pl.col("SnapshotTime").max() - pl.col("SnapshotTime").min())
-                .dt.total_seconds()
-                .alias("Duration"),
+                first_snapshot.cast(pl.Date).alias("DateRange Min"),
+                last_snapshot.cast(pl.Date).alias("DateRange Max"),
+                (last_snapshot - first_snapshot).dt.total_seconds().alias("Duration"),
                 cdh_utils.weighted_performance_polars().alias("Performance"),
                 pl.col("Positives").sum(),
                 pl.col("Negatives").sum(),
@@ -586,52 +837,117 @@ class Prediction:
             .with_columns(
                 usesImpactAnalyzer=(pl.col("Positives_NBA") > 0)
                 & (pl.col("Negatives_NBA") > 0),
-                ControlPercentage=100.0
-                * (pl.col("Positives_Control") + pl.col("Negatives_Control"))
-                / (
-                    pl.col("Positives_Test")
-                    + pl.col("Negatives_Test")
-                    + pl.col("Positives_Control")
-                    + pl.col("Negatives_Control")
-                    + pl.col("Positives_NBA")
-                    + pl.col("Negatives_NBA")
+                # Ratios in Float32, the summed counts keep their exact type
+                ControlPercentage=(100.0 * counts_control / counts_total).cast(
+                    pl.Float32
                 ),
-                TestPercentage=100.0
-                * (pl.col("Positives_Test") + pl.col("Negatives_Test"))
-                / (
-                    pl.col("Positives_Test")
-                    + pl.col("Negatives_Test")
-                    + pl.col("Positives_Control")
-                    + pl.col("Negatives_Control")
-                    + pl.col("Positives_NBA")
-                    + pl.col("Negatives_NBA")
-                ),
-                CTR=pl.col("Positives") / (pl.col("Positives") + pl.col("Negatives")),
-                CTR_Test=pl.col("Positives_Test")
-                / (pl.col("Positives_Test") + pl.col("Negatives_Test")),
-                CTR_Control=pl.col("Positives_Control")
-                / (pl.col("Positives_Control") + pl.col("Negatives_Control")),
-                CTR_NBA=pl.col("Positives_NBA")
-                / (pl.col("Positives_NBA") + pl.col("Negatives_NBA")),
+                TestPercentage=(100.0 * counts_test / counts_total).cast(pl.Float32),
+                CTR=(
+                    pl.col("Positives") / (pl.col("Positives") + pl.col("Negatives"))
+                ).cast(pl.Float32),
+                CTR_Test=ctr_test.cast(pl.Float32),
+                CTR_Control=ctr_control.cast(pl.Float32),
+                CTR_NBA=(
+                    pl.col("Positives_NBA")
+                    / (pl.col("Positives_NBA") + pl.col("Negatives_NBA"))
+                ).cast(pl.Float32),
                 ChannelDirectionGroup=pl.when(
                     pl.col("Channel").is_not_null()
                     & pl.col("Direction").is_not_null()
-                    & pl.col("Channel").is_in(["Other", "Unknown", ""]).not_()
-                    & pl.col("Direction").is_in(["Other", "Unknown", ""]).not_()
+                    # Direct comparisons are cheaper than is_in for these few values
+                    & (pl.col("Channel") != "Other")
+                    & (pl.col("Channel") != "Unknown")
+                    & (pl.col("Channel") != "")
+                    & (pl.col("Direction") != "Other")
+                    & (pl.col("Direction") != "Unknown")
+                    & (pl.col("Direction") != "")
                     & pl.col("isMultiChannelPrediction").not_()
                 )
                 .then(pl.concat_str(["Channel", "Direction"], separator="/"))
                 .otherwise(pl.lit("Other")),
                 isValid=self.prediction_validity_expr,
+                Lift=((ctr_test - ctr_control) / ctr_control).cast(pl.Float32),
             )
-            .with_columns(
-                Lift=(pl.col("CTR_Test") - pl.col("CTR_Control"))
-                / pl.col("CTR_Control"),
-            )
-            .drop([] if debug else ([] + ([] if by_period is None else ["Period"])))
+            .drop(dropped_columns)
             .sort("Prediction", "DateRange Min")
         )
 
+    def summary_by_channel_for_periods(
+        self,
+        periods: List[str],
+        custom_predictions: Optional[List[List]] = None,
+        *,
+        start_date: Optional[datetime.datetime] = None,
+        end_date: Optional[datetime.datetime] = None,
+        window: Optional[Union[int, datetime.timedelta]] = None,
+        query: Optional[QUERY] = None,
+        drop_multichannel: bool = False,
+        drop_unknown_channel: bool = False,
+    ) -> Dict[str, pl.DataFrame]:
+        """Summarize prediction per channel for several time periods at once
+
+        The summaries are collected in one go, so the prediction data they share
+        is only processed once, rather than once per call to
+        :meth:`summary_by_channel`.
+
+        Parameters
+        ----------
+        periods : List[str]
+            The time periods to summarize by, each as the `by_period` argument of
+            :meth:`summary_by_channel`, for example ["1d", "1w", "1mo"].
+        custom_predictions : Optional[List[CDH_Guidelines.NBAD_Prediction]], optional
+            Optional list with custom prediction name to channel mappings. Defaults to None.
+        start_date : datetime.datetime, optional
+            Start date of the summary period, as in :meth:`summary_by_channel`.
+        end_date : datetime.datetime, optional
+            End date of the summary period, as in :meth:`summary_by_channel`.
+        window : int or datetime.timedelta, optional
+            Number of days or timedelta for the summary period, as in :meth:`summary_by_channel`.
+        query : QUERY, optional
+            An optional query to apply to the prediction data before summarizing.
+            For details, see :meth:`pdstools.utils.cdh_utils._apply_query`.
+        drop_multichannel : bool, optional
+            If True, leaves out the multi-channel predictions. Defaults to False.
+        drop_unknown_channel : bool, optional
+            If True, leaves out the predictions that could not be mapped to a channel. Defaults to False.
+
+        Returns
+        -------
+        Dict[str, pl.DataFrame]
+            The summary per channel for each of the periods, keyed by period. See
+            :meth:`summary_by_channel` for the fields.
+        """
+        # Each period once, a repeated period would otherwise be summarized twice
+        # and end up twice in its summary
+        periods = list(dict.fromkeys(periods))
+        if not periods:
+            return {}
+
+        # A single collect of all summaries, tagged with their period
+        summaries = pl.concat(
+            [
+                self.summary_by_channel(
+                    custom_predictions,
+                    start_date=start_date,
+                    end_date=end_date,
+                    window=window,
+                    by_period=period,
+                    query=query,
+                    drop_multichannel=drop_multichannel,
+                    drop_unknown_channel=drop_unknown_channel,
+                ).with_columns(_Period=pl.lit(period))
+                for period in periods
+            ]
+        ).collect()
+
+        summary_per_period = summaries.partition_by(
+            "_Period", maintain_order=True, include_key=False, as_dict=True
+        )
+        no_summary = summaries.clear().drop("_Period")
+        return {
+            period: summary_per_period.get((period,), no_summary) for period in periods
+        }
+
     # TODO rethink use of multi-channel. If the only valid predictions are multi-channel predictions
     # then use those. If there are valid non-multi-channel predictions then only use those.
     def overall_summary(
@@ -703,73 +1019,98 @@ class Prediction:
             debug=True,  # should give us Period
         )
 
-        if (
-            channel_summary.select(
-                (pl.col("isMultiChannelPrediction").not_() & pl.col("isValid")).any()
-            )
-            .collect()
-            .item()
-        ):
-            # There are valid non-multi-channel predictions
-            validity_filter_expr = pl.col("isMultiChannelPrediction").not_() & pl.col(
-                "isValid"
-            )
-        else:
-            validity_filter_expr = pl.col("isValid")
+        # If there are valid non-multi-channel predictions, only use those. This
+        # is part of the same plan so the channel summary is only computed once.
+        has_valid_single_channel_predictions = (
+            pl.col("isMultiChannelPrediction").not_() & pl.col("isValid")
+        ).any()
+        validity_filter_expr = pl.col("isValid") & (
+            pl.col("isMultiChannelPrediction").not_()
+            | has_valid_single_channel_predictions.not_()
+        )
 
-        return (
-            channel_summary.filter(validity_filter_expr)
-            .group_by(["Period"] if by_period is not None else None)
-            .agg(
-                pl.col("DateRange Min").min(),
-                pl.col("DateRange Max").max(),
-                pl.col("Duration").max(),
-                pl.concat_str(["Channel", "Direction"], separator="/")
-                .n_unique()
-                .alias("Number of Valid Channels"),
-                cdh_utils.weighted_average_polars("Lift", "Responses").alias(
-                    "Overall Lift"
-                ),
-                cdh_utils.weighted_performance_polars("Performance", "Responses").alias(
-                    "Performance"
-                ),
-                pl.col("Positives")
-                .filter(Direction="Inbound")
-                .sum()
-                .alias("Positives Inbound"),
-                pl.col("Positives")
-                .filter(Direction="Outbound")
-                .sum()
-                .alias("Positives Outbound"),
-                pl.col("Responses")
-                .filter(Direction="Inbound")
+        # Conditional sums instead of filtered ones, with the direction masks
+        # bound once so they are shared by all the directional totals
+        is_inbound = pl.col("Direction") == "Inbound"
+        is_outbound = pl.col("Direction") == "Outbound"
+        # Channel at the lowest lift looked up by position, rather than by
+        # filtering on the minimum, and only reported when that lift is negative.
+        # Kept in the main aggregation: a separate aggregation over the negative
+        # lifts would need a join and a second pass over the channel summary.
+        min_lift = pl.col("Lift").min()
+        has_negative_lift = min_lift < 0
+        # Weighted averages of the control and test percentages. Both have the
+        # same denominator so they are missing for the same channels, which lets
+        # them share the filter and the sum of the weights.
+        has_percentages = (
+            pl.col("ControlPercentage").is_finite() & pl.col("Responses").is_not_null()
+        )
+        responses_with_percentages = pl.col("Responses").filter(has_percentages).sum()
+
+        summary_aggs = [
+            pl.col("DateRange Min").min(),
+            pl.col("DateRange Max").max(),
+            pl.col("Duration").max(),
+            pl.concat_str(["Channel", "Direction"], separator="/")
+            .n_unique()
+            .alias("Number of Valid Channels"),
+            cdh_utils.weighted_average_polars("Lift", "Responses").alias(
+                "Overall Lift"
+            ),
+            cdh_utils.weighted_performance_polars("Performance", "Responses").alias(
+                "Performance"
+            ),
+            pl.when(is_inbound)
+            .then(pl.col("Positives"))
+            .otherwise(0)
+            .sum()
+            .alias("Positives Inbound"),
+            pl.when(is_outbound)
+            .then(pl.col("Positives"))
+            .otherwise(0)
+            .sum()
+            .alias("Positives Outbound"),
+            pl.when(is_inbound)
+            .then(pl.col("Responses"))
+            .otherwise(0)
+            .sum()
+            .alias("Responses Inbound"),
+            pl.when(is_outbound)
+            .then(pl.col("Responses"))
+            .otherwise(0)
+            .sum()
+            .alias("Responses Outbound"),
+            pl.when(has_negative_lift)
+            .then(pl.col("Channel").get(pl.col("Lift").arg_min()))
+            .alias("Channel with Minimum Negative Lift"),
+            pl.when(has_negative_lift).then(min_lift).alias("Minimum Negative Lift"),
+            pl.col("usesImpactAnalyzer").any(),
+            (
+                (pl.col("ControlPercentage") * pl.col("Responses"))
+                .filter(has_percentages)
                 .sum()
-                .alias("Responses Inbound"),
-                pl.col("Responses")
-                .filter(Direction="Outbound")
+                / responses_with_percentages
+            ).alias("ControlPercentage"),
+            (
+                (pl.col("TestPercentage") * pl.col("Responses"))
+                .filter(has_percentages)
                 .sum()
-                .alias("Responses Outbound"),
-                pl.col("Channel")
-                .filter((pl.col("Lift") == pl.col("Lift").min()) & (pl.col("Lift") < 0))
-                .first()
-                .alias("Channel with Minimum Negative Lift"),
-                pl.col("Lift")
-                .filter((pl.col("Lift") == pl.col("Lift").min()) & (pl.col("Lift") < 0))
-                .first()
-                .alias("Minimum Negative Lift"),
-                pl.col("usesImpactAnalyzer"),
-                cdh_utils.weighted_average_polars(
-                    "ControlPercentage", "Responses"
-                ).alias("ControlPercentage"),
-                cdh_utils.weighted_average_polars("TestPercentage", "Responses").alias(
-                    "TestPercentage"
-                ),
+                / responses_with_percentages
+            ).alias("TestPercentage"),
+        ]
+
+        valid_summary = channel_summary.filter(validity_filter_expr)
+        if by_period is None:
+            # A single row, or none at all when there are no valid predictions
+            summary = valid_summary.select(summary_aggs).filter(
+                pl.col("Number of Valid Channels") > 0
             )
-            .drop(["literal"] if by_period is None else [])  # created by null group
-            .with_columns(
-                # CTR=(pl.col("Positives")) / (pl.col("Responses")),
-                usesImpactAnalyzer=pl.col("usesImpactAnalyzer").list.any(),
+        else:
+            # Only the rows per period need ordering
+            summary = (
+                valid_summary.group_by("Period").agg(summary_aggs).sort("DateRange Min")
             )
-            .drop([] if debug else ([] + ([] if by_period is None else ["Period"])))
-            .sort("DateRange Min")
-        )
+            if not debug:
+                summary = summary.drop("Period")
+
+        return summary
@@ -80,8 +80,8 @@ def _apply_query(df: F, query: Optional[QUERY] = None, allow_empty: bool = False
 def _combine_queries(existing_query: QUERY, new_query: pl.Expr) -> QUERY:
     if isinstance(existing_query, pl.Expr):
         return existing_query & new_query
-    elif isinstance(existing_query, List):
-        return existing_query + [new_query]
+    elif isinstance(existing_query, (list, tuple)):
+        return list(existing_query) + [new_query]
     elif isinstance(existing_query, Dict):
         # Convert the dictionary to a list of expressions
         existing_exprs = [pl.col(k).is_in(v) for k, v in existing_query.items()]
@@ -90,6 +90,38 @@ def _combine_queries(existing_query: QUERY, new_query: pl.Expr) -> QUERY:
         raise ValueError("Unsupported query type")
 
 
+def _split_query(
+    query: Optional[QUERY], columns: Iterable[str]
+) -> Tuple[Optional[QUERY], Optional[QUERY]]:
+    """Split a query in the parts that only refer to the given columns and the rest.
+
+    Useful to push down (parts of) a query to before an aggregation. The
+    individual expressions of a list query, or the keys of a dict query, are
+    the units that get split; a single expression is never split up.
+    """
+    if query is None:
+        return None, None
+
+    if isinstance(query, pl.Expr):
+        query = [query]
+    elif isinstance(query, dict):
+        query = [pl.col(k).is_in(v) for k, v in query.items()]
+    elif not isinstance(query, (list, tuple)) or not all(
+        isinstance(expr, pl.Expr) for expr in query
+    ):
+        raise ValueError(f"Unsupported query type: {type(query)}")
+
+    columns = set(columns)
+    pushed_down, remaining = [], []
+    for expr in query:
+        if set(expr.meta.root_names()) <= columns:
+            pushed_down.append(expr)
+        else:
+            remaining.append(expr)
+
+    return pushed_down or None, remaining or None
+
+
 def default_predictor_categorization(
     x: Union[str, pl.Expr] = pl.col("PredictorName"),
 ) -> pl.Expr:
@@ -1187,22 +1219,31 @@ def get_start_end_date_args(
     window: Optional[Union[int, datetime.timedelta]] = None,
     datetime_field = 'SnapshotTime'
 ):
-    if isinstance(data, pl.DataFrame):
-        data_min_date = data.select(pl.col(datetime_field).min()).item()
-        data_max_date = data.select(pl.col(datetime_field).max()).item()
-    elif isinstance(data, pl.LazyFrame):
-        data_min_date = data.select(pl.col(datetime_field).min()).collect().item()
-        data_max_date = data.select(pl.col(datetime_field).max()).collect().item()
-    else:   # pl.Series
-        data_min_date = data.min()
-        data_max_date = data.max()
-
-    # print(f"**ENTER** Start={start_date}, End={end_date}, Window={window}, Data Min={data_min_date}, Data Max={data_max_date}")
-
     if window:
         if not isinstance(window, datetime.timedelta):
             window = datetime.timedelta(days=window)
 
+    # Only look at the data when the dates can't be derived from the arguments,
+    # and then get both in one go, collecting a lazy frame only once
+    if (not end_date and (window is None or start_date is None)) or (
+        not start_date and window is None
+    ):
+        if isinstance(data, pl.Series):
+            data_min_date = data.min()
+            data_max_date = data.max()
+        else:
+            data_min_date, data_max_date = (
+                data.lazy()
+                .select(
+                    pl.col(datetime_field).min().alias("min"),
+                    pl.col(datetime_field).max().alias("max"),
+                )
+                .collect()
+                .row(0)
+            )
+
+    # print(f"**ENTER** Start={start_date}, End={end_date}, Window={window}, Data Min={data_min_date}, Data Max={data_max_date}")
+
     if start_date and end_date and window:
         raise ValueError("Only max two of 'start_date', 'end_date' or 'window_days' can be set")
     if not end_date:
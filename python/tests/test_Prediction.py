@@ -6,6 +6,7 @@ import datetime
 
 import polars as pl
 import pytest
+from polars.testing import assert_frame_equal
 from pdstools import Prediction
 from pdstools.utils import cdh_utils
 
@@ -61,6 +62,123 @@ def test_available(preds_singleday):
     assert preds_singleday.is_valid
 
 
+def test_not_available():
+    preds = Prediction(
+        mock_prediction_data.filter(pl.col("pyModelType") != "PREDICTION")
+    )
+    assert not preds.is_available
+    assert not preds.is_valid
+    assert not preds.is_available
+
+
+def test_predictions_require_test_and_control():
+    preds = Prediction(
+        mock_prediction_data.filter(
+            (pl.col("pyDataUsage") != "Control")
+            | (
+                pl.col("pyModelId")
+                != "DATA-DECISION-REQUEST-CUSTOMER!PREDICTWEBPROPENSITY"
+            )
+        )
+    )
+    assert preds.predictions.select(pl.col("ModelName").unique().sort()).collect()[
+        "ModelName"
+    ].to_list() == [
+        "MYCUSTOMPREDICTION",
+        "PREDICTACTIONPROPENSITY",
+        "PREDICTMOBILEPROPENSITY",
+    ]
+
+
+def test_predictions_null_count_on_existing_record():
+    web_control = (pl.col("pyDataUsage") == "Control") & (
+        pl.col("pyModelId") == "DATA-DECISION-REQUEST-CUSTOMER!PREDICTWEBPROPENSITY"
+    )
+    preds = Prediction(
+        mock_prediction_data.with_columns(
+            pyCount=pl.when(web_control).then(None).otherwise(pl.col("pyCount"))
+        )
+    )
+    web = preds.predictions.filter(pl.col("ModelName") == "PREDICTWEBPROPENSITY")
+    assert web.select(
+        pl.col("ResponseCount_Control").unique()
+    ).collect().to_series().to_list() == [None]
+    assert preds.summary_by_channel().collect().height == 4
+
+    preds = Prediction(
+        mock_prediction_data.with_columns(
+            pyCount=pl.when(pl.col("pyDataUsage") == "Test")
+            .then(None)
+            .otherwise(pl.col("pyCount"))
+        )
+    )
+    assert preds.predictions.collect().height == 12
+    assert preds.is_valid
+
+
+def test_predictions_duplicate_records_summed():
+    preds = Prediction(
+        pl.concat(
+            [
+                mock_prediction_data,
+                mock_prediction_data.filter(pl.col("pyDataUsage") == "Test"),
+            ]
+        )
+    )
+    counts = (
+        preds.predictions.group_by("ModelName")
+        .agg(pl.col("Positives_Test").unique())
+        .sort("ModelName")
+        .collect()
+    )
+    assert counts["Positives_Test"].to_list() == [[800], [1600], [800], [1600]]
+
+
+def test_prediction_validity_missing_counts():
+    preds = Prediction(
+        mock_prediction_data.with_columns(
+            pyPositives=pl.when(pl.col("pyDataUsage") == "Test")
+            .then(None)
+            .otherwise(pl.col("pyPositives"))
+        )
+    )
+    validity = preds.predictions.select("isValidPrediction").collect()
+    assert validity["isValidPrediction"].null_count() == validity.height
+
+
+def test_model_id_parts():
+    preds = Prediction(
+        mock_prediction_data.with_columns(
+            pyModelId=pl.col("pyModelId").str.replace(
+                "!PREDICTWEBPROPENSITY", "!EXTRA!PREDICTWEBPROPENSITY"
+            )
+        )
+    )
+    parts = (
+        preds.predictions.filter(pl.col("ModelName") == "PREDICTWEBPROPENSITY")
+        .select("Class")
+        .unique()
+        .collect()
+    )
+    assert parts["Class"].to_list() == ["DATA-DECISION-REQUEST-CUSTOMER!EXTRA"]
+
+    # A trailing "!" is part of the model name, as with the former regexes
+    preds = Prediction(
+        mock_prediction_data.with_columns(
+            pyModelId=pl.col("pyModelId").str.replace(
+                "!PREDICTWEBPROPENSITY", "!PREDICTWEBPROPENSITY!"
+            )
+        )
+    )
+    parts = (
+        preds.predictions.filter(pl.col("ModelName") == "PREDICTWEBPROPENSITY!")
+        .select("Class")
+        .unique()
+        .collect()
+    )
+    assert parts["Class"].to_list() == ["DATA-DECISION-REQUEST-CUSTOMER"]
+
+
 def test_summary_by_channel_cols(preds_singleday):
     summary = preds_singleday.summary_by_channel().collect()
     assert summary.columns == [
@@ -177,6 +295,66 @@ def test_summary_by_channel_channeldirectiongroup(preds_singleday):
     ]
 
 
+def test_summary_by_channel_query(preds_fewdays):
+    summary = preds_fewdays.summary_by_channel(
+        query=pl.col("SnapshotTime") > datetime.date(2040, 5, 15)
+    ).collect()
+    assert summary["DateRange Min"].to_list() == [datetime.date(2040, 5, 16)] * 4
+    assert summary["Positives"].to_list() == [1000, 2000, 1000, 2000]
+
+    summary = preds_fewdays.summary_by_channel(
+        query=(pl.col("SnapshotTime") > datetime.date(2040, 5, 15),)
+    ).collect()
+    assert summary.height == 4
+
+
+def test_summary_by_channel_exact_counts():
+    # 2**24 + 1 can not be represented exactly as a Float32
+    preds = Prediction(
+        mock_prediction_data.with_columns(
+            pyPositives=pl.when(pl.col("pyDataUsage") == "Test")
+            .then(2**24 + 1)
+            .otherwise(pl.col("pyPositives"))
+        )
+    )
+    summary = preds.summary_by_channel().collect()
+    # summed over the three daily records of each model
+    assert summary["Positives_Test"].to_list() == [3 * (2**24 + 1)] * 4
+    assert summary["CTR_Test"].dtype == pl.Float32
+
+
+def test_summary_by_channel_drop_channels(preds_singleday):
+    summary = preds_singleday.summary_by_channel(
+        drop_multichannel=True, drop_unknown_channel=True
+    ).collect()
+    assert summary["Channel"].to_list() == ["Mobile", "Web"]
+
+
+def test_summary_by_channel_for_periods(preds_fewdays):
+    summaries = preds_fewdays.summary_by_channel_for_periods(["1d", "1mo"])
+    assert list(summaries.keys()) == ["1d", "1mo"]
+    assert_frame_equal(
+        summaries["1d"], preds_fewdays.summary_by_channel(by_period="1d").collect()
+    )
+    assert summaries["1mo"].height == 4
+
+    summaries = preds_fewdays.summary_by_channel_for_periods(["1d", "1d"])
+    assert list(summaries.keys()) == ["1d"]
+    assert summaries["1d"].height == 8
+
+
+def test_summary_by_channel_date_range_cache():
+    preds = Prediction.from_mock_data(days=10)
+
+    preds.summary_by_channel()
+    preds.overall_summary()
+    assert len(preds._date_range_cache) == 1
+
+    last_day = preds._start_end_date(None, None, None)[1]
+    preds.predictions = preds.predictions.filter(pl.col("SnapshotTime") < last_day)
+    assert preds._start_end_date(None, None, None)[1] < last_day
+
+
 def test_overall_summary_cols(preds_singleday):
     summary = preds_singleday.overall_summary().collect()
     assert summary.columns == [
@@ -203,6 +381,17 @@ def test_overall_summary_n_valid_channels(preds_singleday):
     assert preds_singleday.overall_summary().collect()["Number of Valid Channels"].item() == 3
 
 
+def test_overall_summary_only_multichannel():
+    preds = Prediction(
+        mock_prediction_data.filter(
+            pl.col("pyModelId")
+            == "DATA-DECISION-REQUEST-CUSTOMER!PredictActionPropensity"
+        )
+    )
+    # multi-channel predictions are used when there are no other valid predictions
+    assert preds.overall_summary().collect()["Number of Valid Channels"].item() == 1
+
+
 def test_overall_summary_overall_lift(preds_singleday):
     # print(test.overall_summary().collect())
     # print(test.summary_by_channel().collect())
@@ -225,6 +414,26 @@ def test_overall_summary_channel_min_lift(preds_singleday):
         is None
     )
 
+
+def test_overall_summary_negative_lift():
+    preds = Prediction(
+        mock_prediction_data.with_columns(
+            pyPositives=pl.when(
+                (pl.col("pyDataUsage") == "Control")
+                & (
+                    pl.col("pyModelId")
+                    == "DATA-DECISION-REQUEST-CUSTOMER!PREDICTMOBILEPROPENSITY"
+                )
+            )
+            .then(1000)
+            .otherwise(pl.col("pyPositives"))
+        )
+    )
+    summ = preds.overall_summary().collect()
+    assert summ["Channel with Minimum Negative Lift"].item() == "Mobile"
+    assert round(summ["Minimum Negative Lift"].item(), 5) == -0.66667
+
+
 def test_overall_summary_by_period(preds_fewdays):
     summ = preds_fewdays.overall_summary(by_period="1d").collect()
     assert summ.height == 2
@@ -258,6 +467,16 @@ def test_overall_summary_ia(preds_singleday):
     assert preds_singleday.overall_summary().collect()["usesImpactAnalyzer"].to_list() == [True]
 
 
+def test_summaries_streaming(preds_fewdays):
+    # No list aggregations or other constructs that need the in-memory engine
+    for summary in [
+        preds_fewdays.summary_by_channel(by_period="1d"),
+        preds_fewdays.overall_summary(),
+        preds_fewdays.overall_summary(by_period="1d"),
+    ]:
+        assert_frame_equal(summary.collect(engine="streaming"), summary.collect())
+
+
 def test_plots():
     prediction = Prediction.from_mock_data()
 
@@ -270,3 +489,70 @@ def test_plots():
     assert isinstance(prediction.plot.lift_trend("2d", return_df=True), pl.LazyFrame)
     assert prediction.plot.responsecount_trend("1m") is not None
     assert prediction.plot.ctr_trend("5d") is not None
+
+    # one trace per prediction, also when facetting
+    assert len(prediction.plot.lift_trend().data) == 3
+    assert len(prediction.plot.ctr_trend(facetting=True).data) == 3
+
+
+def test_plots_trend_data_cache():
+    prediction = Prediction.from_mock_data(days=10)
+
+    prediction.plot.performance_trend("1w")
+    cached = prediction.plot._collected_prediction_trend_data("1w", None)
+    prediction.plot.lift_trend("1w")
+    assert prediction.plot._collected_prediction_trend_data("1w", None)[0] is cached[0]
+
+    prediction.predictions = prediction.predictions.filter(
+        pl.col("ModelName") == "PREDICTWEBPROPENSITY"
+    )
+    assert (
+        prediction.plot._collected_prediction_trend_data("1w", None)[0] is not cached[0]
+    )
+    assert len(prediction.plot._trend_data_cache) == 1
+
+    for period in range(1, prediction.plot._trend_data_cache_size + 2):
+        prediction.plot._collected_prediction_trend_data(f"{period}d", None)
+    assert (
+        len(prediction.plot._trend_data_cache) == prediction.plot._trend_data_cache_size
+    )
+    assert ("1d", None) not in prediction.plot._trend_data_cache
+
+
+def test_plots_trends_all():
+    prediction = Prediction.from_mock_data(days=10)
+
+    trends = prediction.plot.trends_all("1w")
+    assert list(trends.keys()) == ["performance", "lift", "ctr", "responsecount"]
+    assert all(len(fig.data) == 3 for fig in trends.values())
+
+
+def test_plots_query():
+    prediction = Prediction.from_mock_data(days=10)
+
+    # Channel only exists after summarizing, ModelName only before
+    trend = prediction.plot.lift_trend(
+        "1d",
+        query=[
+            pl.col("Channel") == "Web",
+            pl.col("ModelName") == "PREDICTWEBPROPENSITY",
+        ],
+        return_df=True,
+    ).collect()
+    assert trend["Prediction"].unique().to_list() == ["Web (PREDICTWEBPROPENSITY)"]
+    assert trend.height == 10
+
+    assert prediction.plot.performance_trend(query={"Channel": ["Web"]}) is not None
+
+    # Positives exists both before and after summarizing, the query applies to
+    # the summarized trend data
+    trend = prediction.plot.lift_trend(
+        "1w", query=pl.col("Positives") > 2000, return_df=True
+    ).collect()
+    assert trend["Positives"].min() > 2000
+    assert_frame_equal(
+        trend,
+        prediction.plot.lift_trend("1w", return_df=True)
+        .filter(pl.col("Positives") > 2000)
+        .collect(),
+    )
@@ -657,6 +657,57 @@ def test_apply_query():
         cdh_utils._apply_query(df, query={"categories": ["D"]})
 
 
+def test_split_query():
+    assert cdh_utils._split_query(None, ["A"]) == (None, None)
+
+    pushed_down, remaining = cdh_utils._split_query(pl.col("A") > 1, ["A", "B"])
+    assert len(pushed_down) == 1 and remaining is None
+
+    pushed_down, remaining = cdh_utils._split_query(
+        [pl.col("A") > 1, pl.col("C") == "x", (pl.col("A") + pl.col("C")) > 0],
+        ["A", "B"],
+    )
+    assert len(pushed_down) == 1 and len(remaining) == 2
+
+    pushed_down, remaining = cdh_utils._split_query({"C": ["x"]}, ["A", "B"])
+    assert pushed_down is None and len(remaining) == 1
+
+    with pytest.raises(ValueError):
+        cdh_utils._split_query("ABC", ["A"])
+
+
+def test_get_start_end_date_args():
+    data = pl.LazyFrame(
+        {"SnapshotTime": [datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)]}
+    )
+    assert cdh_utils.get_start_end_date_args(data) == (
+        datetime.date(2024, 1, 1),
+        datetime.date(2024, 1, 31),
+    )
+    assert cdh_utils.get_start_end_date_args(data, window=7) == (
+        datetime.date(2024, 1, 25),
+        datetime.date(2024, 1, 31),
+    )
+    assert cdh_utils.get_start_end_date_args(data.collect()["SnapshotTime"]) == (
+        datetime.date(2024, 1, 1),
+        datetime.date(2024, 1, 31),
+    )
+
+    # No need to look at the data when the dates follow from the arguments
+    no_data = pl.LazyFrame({"Other": [1]})
+    assert cdh_utils.get_start_end_date_args(
+        no_data, start_date=datetime.date(2024, 1, 1), window=7
+    ) == (datetime.date(2024, 1, 1), datetime.date(2024, 1, 7))
+
+    with pytest.raises(ValueError):
+        cdh_utils.get_start_end_date_args(
+            data,
+            start_date=datetime.date(2024, 1, 1),
+            end_date=datetime.date(2024, 1, 7),
+            window=7,
+        )
+
+
 def test_extract_keys():
     non_string = pl.DataFrame({"Name": [1, 2, 3]})
     assert cdh_utils._extract_keys(non_string).equals(non_string)